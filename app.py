@@ -1,10 +1,12 @@
 from configparser import ConfigParser
-from datetime import timedelta
-from math import log
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
 
 # Import program-specific modules
 from utils import *
-from extract import get_data, build_table
+from extract import get_data, build_table, close_session, \
+    new_asteroid_columns, append_asteroid_row, asteroid_columns_to_table
 from load import save_new_data, upsert_data
 from transform import clean_table, inner_join
 from optimize import z_order_table
@@ -18,12 +20,14 @@ def extract_and_load(tgt_path: str, api_url: str, incremental_values: dict, defa
     records = get_data(api_url, 'feed', params=incremental_values, field='near_earth_objects')
     close_approach_data = build_table(records, 'close_approach_data')
 
-    # Extract all the NEOs IDs as a list 
-    id_list = close_approach_data['neo_reference_id'].tolist()
+    # Extract the unique NEOs IDs, since a NEO can approach more than once in the same period
+    id_list = close_approach_data['neo_reference_id'].unique()
 
-    # Extraction: asteroid_data
-    asteroids = get_data(api_url, 'neo', params=default_values, lookup=id_list)
-    asteroid_data = build_table(asteroids, 'asteroid_data')
+    # Extraction: asteroid_data, reducing each response to its columns as it arrives
+    asteroid_columns = new_asteroid_columns()
+    get_data(api_url, 'neo', params=default_values, lookup=id_list,
+             consumer=lambda neo: append_asteroid_row(asteroid_columns, neo))
+    asteroid_data = asteroid_columns_to_table(asteroid_columns)
 
     # Loading: asteroid_data
     upsert_data(asteroid_data, f'{tgt_path}/asteroid_data',
@@ -34,10 +38,13 @@ def extract_and_load(tgt_path: str, api_url: str, incremental_values: dict, defa
                   f'{tgt_path}/close_approach_data',
                   predicate=f'''tgt.approach_datetime = src.approach_datetime 
                     AND tgt.neo_reference_id = src.neo_reference_id''',
-                  partition_cols=['year', 'month', 'week'])
+                  partition_cols=['extraction_date', 'year', 'month'])
     
-    # Optimize the reading of close_approach_data for the next stage
-    z_order_table(f'{tgt_path}/close_approach_data', ordering_columns=['extraction_date'])
+    # Optimize the merges on both tables (extraction_date is already a partition column)
+    # Only the partition of the present batch is rewritten, since the previous ones are already ordered
+    z_order_table(f'{tgt_path}/close_approach_data', ordering_columns=['neo_reference_id'],
+                  partition_filters=[('extraction_date', '=', date.today().isoformat())])
+    z_order_table(f'{tgt_path}/asteroid_data', ordering_columns=['neo_reference_id'])
 
 
 def cleaning_transform(src_path: str, tgt_path: str, schemas_path: str):
@@ -62,10 +69,13 @@ def cleaning_transform(src_path: str, tgt_path: str, schemas_path: str):
                   f'{tgt_path}/close_approach_data',
                   predicate=f'''tgt.approach_datetime = src.approach_datetime 
                     AND tgt.neo_reference_id = src.neo_reference_id''',
-                  partition_cols=['year', 'month', 'week'])
+                  partition_cols=['extraction_date', 'year', 'month'])
     
-    # Optimize the reading of close_approach_data for the next stage
-    z_order_table(f'{tgt_path}/close_approach_data', ordering_columns=['extraction_date'])
+    # Optimize the merges on both tables (extraction_date is already a partition column)
+    # Only the partition of the present batch is rewritten, since the previous ones are already ordered
+    z_order_table(f'{tgt_path}/close_approach_data', ordering_columns=['neo_reference_id'],
+                  partition_filters=[('extraction_date', '=', date.today().isoformat())])
+    z_order_table(f'{tgt_path}/asteroid_data', ordering_columns=['neo_reference_id'])
 
 
 def analytic_transform(src_path: str, tgt_path: str, schemas_path: str):
@@ -76,23 +86,27 @@ def analytic_transform(src_path: str, tgt_path: str, schemas_path: str):
     # Add columns to asteroid_data with the average estimated diameter and albedo of each asteroid
     insertion_index = len(asteroid_data.columns) - 1
 
-    average_diameter = asteroid_data.apply(
-        lambda row: (row['estimated_diameter_min'] + row['estimated_diameter_max']) / 2, axis=1)
+    diameter_min = asteroid_data['estimated_diameter_min'].to_numpy(dtype='float64')
+    diameter_max = asteroid_data['estimated_diameter_max'].to_numpy(dtype='float64')
+    average_diameter = (diameter_min + diameter_max) * 0.5
     asteroid_data.insert(insertion_index, 'estimated_diameter_avg', average_diameter)
 
-    albedo = asteroid_data.apply(
-        lambda row: 10 ** (-2 * log(row['estimated_diameter_avg'], 10) + 6.2472 - 0.4 * row['absolute_magnitude_h']), axis=1)
+    magnitude = asteroid_data['absolute_magnitude_h'].to_numpy(dtype='float64')
+    albedo = np.power(10, -2 * np.log10(average_diameter) + 6.2472 - 0.4 * magnitude)
     asteroid_data.insert(insertion_index, 'albedo', albedo)
 
     # Separate in close_approach_data the 'approach_datetime' column into date and time.
-    close_approach_data['approach_date'] = close_approach_data['approach_datetime'].dt.date \
-                                            .astype('datetime64[ns]')
-    close_approach_data['approach_time'] = close_approach_data['approach_datetime'].dt.strftime('%H:%M:%S') \
-                                            .astype('datetime64[ns]')
+    approach_datetime = close_approach_data['approach_datetime']
+    approach_date = approach_datetime.dt.normalize()
+    close_approach_data['approach_date'] = approach_date
+
+    # The time of day is anchored to the present date, since Delta Lake has no time-only type
+    time_of_day = approach_datetime.dt.floor('s') - approach_date
+    close_approach_data['approach_time'] = pd.Timestamp.today().normalize() + time_of_day
 
     # Insert in close_approach_data the 'count_per_date' column with the count of NEOs per date
-    close_approach_data['count_per_date'] = close_approach_data.groupby('approach_date')['neo_reference_id'] \
-                                            .transform('count') \
+    counts = close_approach_data['approach_date'].value_counts()
+    close_approach_data['count_per_date'] = close_approach_data['approach_date'].map(counts) \
                                             .astype('int16')
 
     schemas = read_json(schemas_path) # Read the schemas file for the transformation
@@ -101,15 +115,15 @@ def analytic_transform(src_path: str, tgt_path: str, schemas_path: str):
     join_schema = sorted(schemas['near_earth_approaches'], key=lambda col: col['column_position'])
     join_columns = [col['column_name'] for col in join_schema]
 
-    near_earth_approaches = inner_join(asteroid_data, close_approach_data,
-                                      condition='neo_reference_id', select=join_columns)
+    near_earth_approaches = inner_join(close_approach_data, asteroid_data,
+                                       condition='neo_reference_id', select=join_columns)
 
     # Loading: near_earth_approaches
     save_new_data(near_earth_approaches,
                   f'{tgt_path}/near_earth_approaches',
                   predicate=f'''tgt.approach_date = src.approach_date
                     AND tgt.neo_reference_id = src.neo_reference_id''',
-                  partition_cols=['year', 'month', 'week'])
+                  partition_cols=['approach_date'])
 
 
 if __name__ == '__main__':
@@ -149,6 +163,7 @@ if __name__ == '__main__':
 
     # ELT pipeline
     extract_and_load(bronze_path, base_url, incremental_params, default_params)
+    close_session() # Release the connections pooled during the extraction
     cleaning_transform(bronze_path, silver_path, schemas_path) 
     analytic_transform(silver_path, gold_path, schemas_path)
 
@@ -1,15 +1,89 @@
 import asyncio
 import aiohttp
+import aiometer
+import functools
 import urllib.parse
 import requests
+import requests.adapters
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from math import ceil
-from typing import Union
+import pyarrow as pa
+from datetime import date
+from typing import Callable, Union
+
+
+MAX_CONCURRENT_REQUESTS = 16 # Upper bound of simultaneous connections in the asynchronous requests
+MAX_REQUESTS_PER_SECOND = 8 # Rate limit of the asynchronous requests to avoid HTTP 429 errors
+REQUEST_TIMEOUT = 30 # Seconds to wait for the synchronous requests before failing
+
+# Fields of asteroid_data taken directly from each NEO entry, and units of its estimated diameter
+ASTEROID_FIELDS = [('neo_reference_id', pa.string()), ('name', pa.string()), ('nasa_jpl_url', pa.string()),
+                   ('is_potentially_hazardous_asteroid', pa.bool_()), ('absolute_magnitude_h', pa.float64())]
+DIAMETER_UNITS = ['kilometers', 'meters', 'miles', 'feet']
+
+ASTEROID_SCHEMA = pa.schema(
+    ASTEROID_FIELDS +
+    [(f'estimated_diameter.{unit}.estimated_diameter_{bound}', pa.float64())
+     for unit in DIAMETER_UNITS for bound in ['min', 'max']] +
+    [('approaches_to_earth', pa.int16())]
+)
+
+# HTTP session with keep-alive connection pooling shared by every synchronous request
+_requests_session = requests.Session()
+_requests_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Event loop and HTTP session shared by every asynchronous request, created lazily
+_loop = None
+_session = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Function:
+    Returns the event loop used for asynchronous requests, creating it if necessary.
+
+    Returns:
+    asyncio.AbstractEventLoop: The event loop bound to the shared HTTP session.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """
+    Function:
+    Returns the shared HTTP session with a bounded connection pool, creating it if necessary.
+
+    Returns:
+    aiohttp.ClientSession: The session reused across asynchronous requests.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS, ssl=False)
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+def close_session():
+    """
+    Function:
+    Closes the shared HTTP session and its event loop, releasing the pooled connections.
+    """
+    global _loop, _session
+    if _loop is not None and not _loop.is_closed():
+        if _session is not None and not _session.closed:
+            _loop.run_until_complete(_session.close())
+        _loop.close()
+
+    _loop = None
+    _session = None
 
 
 def get_data(base_url: str, endpoint: str, params: dict, \
-             field: Union[None, str]=None, lookup: Union[None, list]=None) -> list:
+             field: Union[None, str]=None, lookup: Union[None, list, np.ndarray]=None, \
+             consumer: Union[None, Callable[[dict], None]]=None) -> list:
     """
     Function:
     Makes a GET request to the API synchronously or asynchronously.
@@ -19,19 +93,21 @@ def get_data(base_url: str, endpoint: str, params: dict, \
     endpoint (str): The API endpoint to which the request will be made.
     params (dict): Query parameters to send with the request.
     field (str): Key of the response JSON dictionary containing the data.
-    lookup (list): List of additional parameters in the URL to iterate
-    over and request data from multiple URLs.
+    lookup (list) | (np.ndarray): Sequence of additional parameters in the URL
+    to iterate over and request data from multiple URLs.
+    consumer (Callable): Function called with each response of the asynchronous
+    requests as it arrives, instead of collecting the responses in the returned list.
 
     Returns:
-    list: The data obtained from the API, returned into a list.
+    list: The data obtained from the API, returned into a list (empty if a consumer is given).
     """
     try:
         queries = urllib.parse.urlencode(params)
-        if not lookup:
+        if lookup is None or len(lookup) == 0:
             # Synchronous request
             url = f'{base_url}/{endpoint}?{queries}'
             try:
-                response = requests.get(url)
+                response = _requests_session.get(url, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
                 parsed_response = response.json()
 
@@ -50,29 +126,32 @@ def get_data(base_url: str, endpoint: str, params: dict, \
 
         else:
             # Asynchronous request
-            data = []
-
-            async def fetch_all(session, iterable):
-                tasks = []
-                for num in iterable:
-                    url = f'{base_url}/{endpoint}/{num}?{queries}'
-                    task = asyncio.create_task(session.get(url, ssl=False))
-                    tasks.append(task)
-                responses = await asyncio.gather(*tasks)
-                return responses
+            async def fetch_one(session, num):
+                url = f'{base_url}/{endpoint}/{num}?{queries}'
+                async with session.get(url) as response:
+                    try:
+                        return await response.json()
+                    except aiohttp.ContentTypeError as e:
+                        print('No se pudo procesar el JSON desde', str(e).split(', ')[2])
+                        return None  # If a JSON request and decoding fails, the URL is reported and skipped
 
-            async def merge_results():
-                async with aiohttp.ClientSession() as session:
-                    responses = await fetch_all(session, lookup)
-                    for item in responses:
-                        try:
-                            neo = await item.json()
-                            data.append(neo)
-                        except aiohttp.ContentTypeError as e:
-                            print('No se pudo procesar el JSON desde', str(e).split(', ')[2])
-                            continue  # If a JSON request and decoding fails, the URL is reported and skipped
+            async def fetch_all(iterable):
+                session = await _get_session()
+                responses = []
+                # Bound both the simultaneous requests and the requests started per second
+                async with aiometer.amap(functools.partial(fetch_one, session), iterable,
+                                         max_at_once=MAX_CONCURRENT_REQUESTS,
+                                         max_per_second=MAX_REQUESTS_PER_SECOND) as results:
+                    async for neo in results:
+                        if neo is None:
+                            continue
+                        if consumer is not None:
+                            consumer(neo) # Hand over the response so it is not kept in memory
+                        else:
+                            responses.append(neo)
+                return responses
 
-            asyncio.run(merge_results())
+            data = _get_loop().run_until_complete(fetch_all(lookup))
 
         return data
 
@@ -81,6 +160,124 @@ def get_data(base_url: str, endpoint: str, params: dict, \
         return []
 
 
+def new_asteroid_columns() -> dict:
+    """
+    Function:
+    Creates the empty columns of the asteroid_data table.
+
+    Returns:
+    dict: A dict object with (column: list of values) format.
+    """
+    return {col: [] for col in ASTEROID_SCHEMA.names}
+
+
+def append_asteroid_row(columns: dict, entry: dict):
+    """
+    Function:
+    Appends the fields of a single NEO entry to the columns of the asteroid_data table.
+    Entries with missing fields are reported and skipped.
+
+    Args:
+    columns (dict): Columns created with new_asteroid_columns().
+    entry (dict): The NEO data as returned by the API.
+    """
+    try:
+        row = [entry.get(col) for col, _ in ASTEROID_FIELDS]
+
+        for unit in DIAMETER_UNITS:
+            diameter = entry['estimated_diameter'][unit]
+            row += [diameter['estimated_diameter_min'], diameter['estimated_diameter_max']]
+
+        # Add 'approaches_to_earth' column with the count of approaches to the Earth registered for each asteroid
+        row.append(sum(approach['orbiting_body'] == 'Earth' for approach in entry['close_approach_data']))
+
+    except (KeyError, TypeError) as e:
+        print('Could not tabulate the NEO, missing field:', e)
+        return
+
+    for col, value in zip(ASTEROID_SCHEMA.names, row):
+        columns[col].append(value)
+
+
+def asteroid_columns_to_table(columns: dict) -> pd.DataFrame:
+    """
+    Function:
+    Converts the columns of the asteroid_data table into a DataFrame with typed columns.
+
+    Args:
+    columns (dict): Columns filled with append_asteroid_row().
+
+    Returns:
+    pd.DataFrame: A DataFrame object with the tabulated data.
+    """
+    try:
+        df = pa.Table.from_pydict(columns, schema=ASTEROID_SCHEMA).to_pandas()
+
+        # Cast the IDs, received as strings, to the integer type declared in the schemas file
+        df = df.astype({'neo_reference_id': 'int32'}, copy=False)
+        return df
+
+    except Exception as e:
+        print('Error:', e)
+        return pd.DataFrame()
+
+
+def _build_asteroid_table(entries: list) -> pd.DataFrame:
+    """
+    Function:
+    Create the asteroid_data table with descriptive data of each NEO.
+
+    Args:
+    entries (list): Object containing the NEOs as dict objects.
+
+    Returns:
+    pd.DataFrame: A DataFrame object with the tabulated data.
+    """
+    columns = new_asteroid_columns()
+    for entry in entries:
+        append_asteroid_row(columns, entry)
+
+    return asteroid_columns_to_table(columns)
+
+
+def _build_close_approach_table(entries: list) -> pd.DataFrame:
+    """
+    Function:
+    Create the close_approach_data table with the approaches of each NEO.
+
+    Args:
+    entries (list): Object containing the NEOs as dict objects.
+
+    Returns:
+    pd.DataFrame: A DataFrame object with the tabulated data.
+    """
+    # Normalize JSON (dict) data
+    df = pd.json_normalize(entries, record_path='close_approach_data', meta='neo_reference_id')
+    df = df.astype({'neo_reference_id': 'int32'}, copy=False) # Downcast the IDs, received as strings
+
+    # Extract the approach year, month and week of month in separate columns
+    df['approach_datetime'] = pd.to_datetime(df['epoch_date_close_approach'], unit='ms') # Convert from Unix Time to datetime
+    date_col = df['approach_datetime']
+
+    # Week of month counted from the weekday of the first day of the month
+    first_weekday = (date_col.dt.weekday - date_col.dt.day + 1) % 7
+
+    df['year'] = date_col.dt.year.astype('int16')
+    df['month'] = date_col.dt.month.astype('int8')
+    df['week'] = ((date_col.dt.day + first_weekday - 1) // 7 + 1).astype('int8')
+
+    # Add 'extraction_date' column with the present execution date
+    df.insert(len(df.columns), 'extraction_date', date.today()) # Stored as date32 in Delta Lake
+    return df
+
+
+# Builder function of each available table
+_BUILDERS = {
+    'asteroid_data': _build_asteroid_table,
+    'close_approach_data': _build_close_approach_table
+}
+
+
 def build_table(entries: list, table: str) -> pd.DataFrame:
     """
     Function:
@@ -94,59 +291,12 @@ def build_table(entries: list, table: str) -> pd.DataFrame:
     pd.DataFrame: A DataFrame object with the tabulated data.
     """
     try:
-        if table == 'asteroid_data':
-            rows = []
-            columns = ['neo_reference_id', 'name', 'nasa_jpl_url', 'is_potentially_hazardous_asteroid',
-                       'absolute_magnitude_h', 'estimated_diameter', 'close_approach_data']
-
-            for entry in entries:
-                # Filter the columns for each entry
-                row = {col: entry[col] for col in columns if col in entry.keys()}
-
-                # Add 'approaches_to_earth' column with the count of approaches to the Earth registered for each asteroid
-                body_approach_list = row.pop('close_approach_data')
-                earth_approach_list = list(filter(lambda x: x['orbiting_body'] == 'Earth', body_approach_list))
-                row['approaches_to_earth'] = len(earth_approach_list)
-                rows.append(row)
-
-            # Normalize JSON (dict) data
-            df = pd.json_normalize(rows)
-
-        elif table == 'close_approach_data':
-            rows = []
-            columns = ['neo_reference_id', 'close_approach_data']
-
-            for entry in entries:
-                # Filter the columns for each entry
-                row = {col: entry[col] for col in columns if col in entry.keys()}
-                rows.append(row)
-
-            # Normalize JSON (dict) data
-            df = pd.json_normalize(rows, record_path=table, meta='neo_reference_id')
-
-            # Extract the approach year, month and week of month in separate columns
-            df['approach_datetime'] = pd.to_datetime(df['epoch_date_close_approach'], unit='ms') # Convert from Unix Time to datetime
-            date_col = df['approach_datetime']
-
-            def week_of_month(date):
-                first_day = date.replace(day=1)
-                day_of_month = date.day
-                adjusted_day_of_month = day_of_month + first_day.weekday()
-                return int(ceil(adjusted_day_of_month / 7))
-
-            df['year'] = date_col.dt.year
-            df['month'] = date_col.dt.month
-            df['week'] = date_col.apply(week_of_month)
-            
-            # Add 'extraction_date' column with the present execution date
-            current_date = datetime.now().strftime('%Y-%m-%d')
-            df.insert(len(df.columns), 'extraction_date', current_date)
-
-        else:
+        builder = _BUILDERS.get(table)
+        if builder is None:
             print('The data for the requested table is not available')
-            df = pd.DataFrame()
+            return pd.DataFrame()
 
-        return df
+        return builder(entries)
 
     except TypeError as e:
         print('TypeError:', e, 'Insert valid arguments')
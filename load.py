@@ -42,6 +42,9 @@ def save_new_data(new_data: pd.DataFrame, path: str, predicate: str, partition_c
     predicate (str): The predicate condition for the MERGE operation.
     partition_cols (list): A list object with the names of the columns to partition the table.
     """
+    if new_data.empty:
+        return # Nothing new to merge or write
+
     try:
         dt = DeltaTable(path)
         new_data_pa = pa.Table.from_pandas(new_data)
@@ -70,6 +73,9 @@ def upsert_data(data: pd.DataFrame, path: str, predicate: str):
     path (str): The path where the data frame will be saved in Delta Lake format.
     predicate (str): The predicate condition for the MERGE operation.
     """
+    if data.empty:
+        return # Nothing to merge or write
+
     try:
         dt = DeltaTable(path)
         data_pa = pa.Table.from_pandas(data)
@@ -2,7 +2,9 @@ from deltalake import DeltaTable
 from deltalake.exceptions import DeltaError
 from deltalake.table import TableOptimizer
 from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
 import os
+from typing import Union
 
 
 def compact_table(path: str, retention_days: int):
@@ -25,7 +27,7 @@ def compact_table(path: str, retention_days: int):
         print('Error in the compact or vacuum operation:', e)
 
 
-def z_order_table(path: str, ordering_columns: list):
+def z_order_table(path: str, ordering_columns: list, partition_filters: Union[None, list]=None):
     """
     Function:
     Optimize the reading of the Delta Table by grouping records by 
@@ -34,10 +36,12 @@ def z_order_table(path: str, ordering_columns: list):
     Args:
     path (str): Path to the Delta Table directory.
     ordering_columns (list): Columns to group rows by.
+    partition_filters (list): Filters in (column, operator, value) format to
+    rewrite only the matching partitions. If not specified, the whole table is rewritten.
     """
     try:
         dt = DeltaTable(path)
-        dt.optimize.z_order(columns=ordering_columns)
+        dt.optimize.z_order(columns=ordering_columns, partition_filters=partition_filters)
     
     except DeltaError as e:
         print('Error in the z-order operation:', e)
@@ -54,8 +58,7 @@ if __name__ == '__main__':
     silver_path = parser['target']['silver']
     gold_path = parser['target']['gold']
 
-    # Optimize each table in each stage
-    for stage in [bronze_path, silver_path, gold_path]:
-        for dir in os.listdir(stage):
-            path = f'{stage}/{dir}'
-            compact_table(path, retention_days=7)
\ No newline at end of file
+    # Optimize each table in each stage concurrently, since the operations are independent and I/O bound
+    paths = [f'{stage}/{dir}' for stage in [bronze_path, silver_path, gold_path] for dir in os.listdir(stage)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda path: compact_table(path, retention_days=7), paths))
\ No newline at end of file
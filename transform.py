@@ -1,5 +1,4 @@
 import pandas as pd
-import re
 from typing import Union
 
 
@@ -25,26 +24,43 @@ def filter_columns(df: pd.DataFrame, columns: list) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def rename_mapping(columns: list, table: str) -> dict:
+    """
+    Function:
+    Builds the mapping between the original column names and their modified names.
+
+    Args:
+    columns (list): Sequence of columns with the original names.
+    table (str): Indicates the table to which the modification is being made to determine how to split the names.
+
+    Returns:
+    dict: A dict object with (original name: new name) format.
+    """
+    # For close_approach_data, take the text behind the first period and for asteroid_data take the text after the last period
+    if table == 'close_approach_data':
+        renamed_columns = [col.split('.', 1)[0] for col in columns]
+    else:
+        renamed_columns = [col.rsplit('.', 1)[-1] for col in columns]
+
+    return dict(zip(columns, renamed_columns))
+
+
 def rename_columns(df: pd.DataFrame, columns: list, table: str) -> pd.DataFrame:
     """
     Function:
-    Renames table columns based on a selection of columns and their modified names using regular expressions.
+    Renames table columns based on a selection of columns and their modified names using string splitting.
 
     Args:
     df (pd.DataFrame): The DataFrame to modify.
     columns (list): Sequence of columns with the original names.
     renamed_columns (list): Sequence of columns with the new names. Must be the same length as 'columns'.
-    table (str): Indicates the table to which the modification is being made to determine the regular expression.
+    table (str): Indicates the table to which the modification is being made to determine how to split the names.
 
     Returns:
     pd.DataFrame: A DataFrame object with the respective modification.
     """
     try:
-        # For close_approach_data, take the text behind the first period and for asteroid_data take the text after the last period
-        pattern = r"^[^.]+" if table == 'close_approach_data' else r"[^.]+$"
-
-        renamed_columns = [re.findall(pattern, col)[0] for col in columns]
-        columns_pair = dict(zip(columns, renamed_columns))
+        columns_pair = rename_mapping(columns, table)
         new_df = df.rename(columns=columns_pair, inplace=False)
         return new_df
 
@@ -84,7 +100,7 @@ def cast_columns(df: pd.DataFrame, columns: list, dtypes: list) -> pd.DataFrame:
 def clean_table(df: pd.DataFrame, schemas: dict, table: str) -> pd.DataFrame:
     """
     Function:
-    Cleans a table using column filtering, column renaming, and column casting functions, 
+    Cleans a table filtering, casting and renaming its columns in a single pass, 
     along with additional modifications to optimize its layout.
 
     Args:
@@ -101,9 +117,13 @@ def clean_table(df: pd.DataFrame, schemas: dict, table: str) -> pd.DataFrame:
         col_names = [col['column_name'] for col in table_schema]
         col_types = [col['column_type'] for col in table_schema]
 
-        transformed_table = filter_columns(df, col_names)
-        transformed_table = cast_columns(transformed_table, col_names, col_types)
-        transformed_table = rename_columns(transformed_table, col_names, table)
+        type_mapping = dict(zip(col_names, col_types))
+        columns_pair = rename_mapping(col_names, table)
+
+        # Filter, cast and rename the columns in a single chain to avoid intermediate copies of the table
+        transformed_table = df.loc[:, col_names] \
+                              .astype(type_mapping, copy=False) \
+                              .rename(columns=columns_pair, copy=False)
 
         return transformed_table
 
@@ -120,7 +140,7 @@ def inner_join(df1: pd.DataFrame, df2: pd.DataFrame, \
 
     Args:
     df1 (pd.DataFrame): The left DataFrame.
-    df2 (pd.DataFrame): The right DataFrame.
+    df2 (pd.DataFrame): The right DataFrame. If its values in 'condition' are unique, it is joined by index.
     condition (str) | (list): Column(s) on which to perform the JOIN operation.
     select (list): Sequence of selected columns.
 
@@ -128,9 +148,15 @@ def inner_join(df1: pd.DataFrame, df2: pd.DataFrame, \
     pd.DataFrame: A DataFrame object with the aforementioned operations.
     """
     try:
-        new_df = pd.merge(df1, df2, how='inner', on=condition)
+        if isinstance(condition, str) and df2[condition].is_unique:
+            # One-to-many JOIN against the unique keys of the right DataFrame, set as its index
+            new_df = df1.join(df2.set_index(condition), on=condition, how='inner',
+                              lsuffix='_x', rsuffix='_y').reset_index(drop=True) # Same suffixes as pd.merge
+        else:
+            new_df = pd.merge(df1, df2, how='inner', on=condition)
+
         if select:
-            new_df = new_df[select]
+            new_df = new_df.loc[:, select]
         return new_df
 
     except TypeError as e:
@@ -1,6 +1,9 @@
 import json
+import os
 from datetime import datetime, date
 from deltalake import DeltaTable
+import pyarrow as pa
+import pyarrow.compute as pc
 import pandas as pd
 
 
@@ -42,11 +45,18 @@ def read_delta_table(table_path: str) -> pd.DataFrame:
     pd.DataFrame: The table converted to a DataFrame object.
     """
     try:
-        df = DeltaTable(table_path).to_pandas()
-        if 'extraction_date' in df.columns:
-            current_date = datetime.strftime(datetime.now(), '%Y-%m-%d')
-            df = df[df['extraction_date'] == current_date] # Select the last extracted batch
-        
+        dataset = DeltaTable(table_path).to_pyarrow_dataset()
+        if 'extraction_date' in dataset.schema.names:
+            # Select the last extracted batch, pushing the filter down to the scan to skip the rest of the files
+            # The date is cast to the stored type, since tables written by earlier versions keep a string or timestamp
+            date_type = dataset.schema.field('extraction_date').type
+            current_date = pa.scalar(date.today(), type=pa.date32()).cast(date_type)
+
+            date_filter = pc.field('extraction_date') == current_date
+            df = dataset.to_table(filter=date_filter).to_pandas()
+        else:
+            df = dataset.to_table().to_pandas()
+
         return df
     
     except Exception as e:
@@ -96,13 +106,15 @@ def write_state(new_value: str, file_path: str, table: str, key: str):
     key (str): Key of the 'state' value as a string.
     """
     try:
-        current_stateful = read_json(file_path)
+        stateful = read_json(file_path)
+        stateful[table][key] = new_value
 
-        new_stateful = current_stateful.copy()
-        new_stateful[table][key] = new_value
+        # Write to a temporary file and replace the original one so an interrupted write cannot corrupt it
+        tmp_path = f'{file_path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(stateful, file, indent=4)
 
-        with open(file_path, 'w') as file:
-            json.dump(new_stateful, file, indent=4)
+        os.replace(tmp_path, file_path)
 
     except KeyError as e:
         print('Could not find key:', e)